@@ -0,0 +1,61 @@
+"""
+テスト共通のフィクスチャ
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import utils.auth
+import utils.cognito
+from utils.auth import TokenValidator, _get_validator
+from utils.cognito import _get_boto_client, get_cognito_client
+
+
+@pytest.fixture
+def user_pool_id():
+    """テスト用のCognitoユーザープールID"""
+    return 'ap-northeast-1_test123'
+
+
+@pytest.fixture
+def region():
+    """テスト用のAWSリージョン"""
+    return 'ap-northeast-1'
+
+
+@pytest.fixture
+def validator(user_pool_id, region):
+    """テスト用のTokenValidator"""
+    return TokenValidator(user_pool_id, region)
+
+
+@pytest.fixture
+def jwt_mocks(mocker):
+    """トークン検証で使用するJWT関連処理のモック"""
+    return SimpleNamespace(
+        header=mocker.patch('utils.auth.jwt.get_unverified_header'),
+        get_key=mocker.patch.object(TokenValidator, '_get_public_key', return_value='mock_public_key'),
+        decode=mocker.patch('utils.auth.jwt.decode')
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """リトライ等の待機でテストが遅くならないよう time.sleep を無効化"""
+    monkeypatch.setattr('time.sleep', lambda *_: None)
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    """モジュールレベルのキャッシュをテストごとにクリア"""
+    yield
+    _get_validator.cache_clear()
+    utils.auth._JWKS_CACHE.clear()
+    utils.auth._TOKEN_CACHE.clear()
+    _get_boto_client.cache_clear()
+    utils.cognito._get_session.cache_clear()
+    get_cognito_client.cache_clear()
+    utils.cognito._USER_CACHE.clear()
+    utils.cognito._load_config.cache_clear()
+    utils.cognito._get_rate_limiter.cache_clear()
+    utils.cognito._REVOKED_JTIS.clear()
@@ -5,7 +5,13 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from botocore.exceptions import ClientError
 import os
+import copy
+import pickle
+import time
+import threading
+import jwt
 
+import utils.cognito
 from utils.cognito import (
     CognitoClient, 
     CognitoError,
@@ -13,9 +19,13 @@ from utils.cognito import (
     AuthorizationError, 
     ValidationError,
     ServiceError,
-    get_cognito_client
+    get_cognito_client,
+    _TokenBucket
 )
 
+# 外部通信を行わない単体テスト
+pytestmark = pytest.mark.unit
+
 
 class TestCognitoClient:
     """CognitoClientクラスのテスト"""
@@ -25,7 +35,7 @@ class TestCognitoClient:
         'COGNITO_CLIENT_ID': 'test_client_id',
         'AWS_REGION': 'ap-northeast-1'
     })
-    @patch('utils.cognito.boto3.client')
+    @patch('botocore.session.Session.create_client')
     def test_initialization_with_env_vars(self, mock_boto_client):
         """環境変数からの初期化をテスト"""
         mock_client = Mock()
@@ -36,9 +46,15 @@ class TestCognitoClient:
         assert client.user_pool_id == 'ap-northeast-1_test123'
         assert client.client_id == 'test_client_id'
         assert client.region == 'ap-northeast-1'
-        mock_boto_client.assert_called_once_with('cognito-idp', region_name='ap-northeast-1')
+        mock_boto_client.assert_called_once_with(
+            'cognito-idp', region_name='ap-northeast-1', config=utils.cognito._get_boto_config()
+        )
+        assert utils.cognito._get_boto_config().retries == {'max_attempts': 10, 'mode': 'adaptive'}
+        assert utils.cognito._get_boto_config().tcp_keepalive is True
+        assert utils.cognito._get_boto_config().max_pool_connections == 20
+        assert utils.cognito._get_boto_config().parameter_validation is False
     
-    @patch('utils.cognito.boto3.client')
+    @patch('botocore.session.Session.create_client')
     def test_initialization_with_parameters(self, mock_boto_client):
         """パラメータからの初期化をテスト"""
         mock_client = Mock()
@@ -53,6 +69,22 @@ class TestCognitoClient:
         assert client.user_pool_id == 'custom_pool'
         assert client.client_id == 'custom_client'
         assert client.region == 'us-west-2'
+        assert not hasattr(client, '__dict__')
+    
+    @patch.dict(os.environ, {
+        'COGNITO_USER_POOL_ID': 'ap-northeast-1_test123',
+        'COGNITO_CLIENT_ID': 'test_client_id'
+    })
+    @patch('botocore.session.Session.create_client')
+    def test_config_loaded_once(self, mock_boto_client):
+        """環境変数の設定が一度だけ読み込まれることをテスト"""
+        CognitoClient()
+        
+        with patch.dict(os.environ, {'COGNITO_USER_POOL_ID': 'ap-northeast-1_changed'}):
+            client = CognitoClient()
+        
+        assert client.user_pool_id == 'ap-northeast-1_test123'
+        assert utils.cognito._load_config.cache_info().misses == 1
     
     def test_initialization_missing_user_pool_id(self):
         """user_pool_idが不足している場合のテスト"""
@@ -64,7 +96,29 @@ class TestCognitoClient:
         with pytest.raises(ValidationError, match="COGNITO_CLIENT_ID is required"):
             CognitoClient(user_pool_id='test_pool')
     
-    @patch('utils.cognito.boto3.client')
+    @patch('botocore.session.Session.create_client')
+    def test_boto3_client_reused_per_region(self, mock_boto_client):
+        """同じリージョンのboto3クライアントが再利用されることをテスト"""
+        mock_boto_client.side_effect = lambda *args, **kwargs: Mock()
+        
+        first = CognitoClient(user_pool_id='test_pool', client_id='test_client', region='ap-northeast-1')
+        second = CognitoClient(user_pool_id='test_pool', client_id='test_client', region='ap-northeast-1')
+        other = CognitoClient(user_pool_id='test_pool', client_id='test_client', region='us-west-2')
+        
+        assert first.client is second.client
+        assert other.client is not first.client
+        assert mock_boto_client.call_count == 2
+        # botocore セッションはリージョン間で共有する
+        assert utils.cognito._get_session.cache_info().misses == 1
+    
+    def test_session_skips_customer_data_path(self):
+        """ユーザーディレクトリのサービスモデルを探索しないことをテスト"""
+        loader = utils.cognito._get_session().get_component('data_loader')
+        
+        assert loader.CUSTOMER_DATA_PATH not in loader.search_paths
+        assert loader.BUILTIN_DATA_PATH in loader.search_paths
+    
+    @patch('botocore.session.Session.create_client')
     def test_initialization_boto3_error(self, mock_boto_client):
         """boto3初期化エラーのテスト"""
         mock_boto_client.side_effect = Exception("AWS client error")
@@ -79,7 +133,7 @@ class TestAuthenticate:
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
         self.mock_cognito_client = Mock()
-        with patch('utils.cognito.boto3.client', return_value=self.mock_cognito_client):
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
             self.client = CognitoClient(
                 user_pool_id='test_pool',
                 client_id='test_client'
@@ -114,6 +168,20 @@ class TestAuthenticate:
             }
         )
     
+    def test_authenticate_without_authentication_result(self):
+        """AuthenticationResultがない場合にデフォルト値で正規化されることをテスト"""
+        self.mock_cognito_client.initiate_auth.return_value = {'ChallengeName': 'NEW_PASSWORD_REQUIRED'}
+        
+        result = self.client.authenticate('test@example.com', 'password123')
+        
+        assert result == {
+            'access_token': None,
+            'refresh_token': None,
+            'id_token': None,
+            'token_type': 'Bearer',
+            'expires_in': 3600
+        }
+    
     def test_authenticate_missing_email(self):
         """メールアドレス不足のテスト"""
         with pytest.raises(ValidationError, match="Email and password are required"):
@@ -163,7 +231,7 @@ class TestLogout:
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
         self.mock_cognito_client = Mock()
-        with patch('utils.cognito.boto3.client', return_value=self.mock_cognito_client):
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
             self.client = CognitoClient(
                 user_pool_id='test_pool',
                 client_id='test_client'
@@ -182,6 +250,63 @@ class TestLogout:
             AccessToken='access_token_123'
         )
     
+    def test_logout_evicts_cached_user_info(self):
+        """ログアウト時にユーザー情報のキャッシュが破棄されることをテスト"""
+        self.mock_cognito_client.get_user.return_value = {'Username': 'test@example.com'}
+        self.mock_cognito_client.global_sign_out.return_value = {}
+        
+        self.client.get_user_info('access_token_123')
+        self.client.logout('access_token_123')
+        self.client.get_user_info('access_token_123')
+        
+        assert self.mock_cognito_client.get_user.call_count == 2
+    
+    def test_logout_revokes_token_locally(self):
+        """ログアウトしたトークンがコンテナ内で失効扱いになることをテスト"""
+        self.mock_cognito_client.global_sign_out.return_value = {}
+        token = jwt.encode({'jti': 'jti-123', 'exp': int(time.time()) + 3600}, 'secret', algorithm='HS256')
+        other = jwt.encode({'jti': 'jti-456', 'exp': int(time.time()) + 3600}, 'secret', algorithm='HS256')
+        
+        assert self.client.is_revoked(token) is False
+        
+        self.client.logout(token)
+        
+        assert self.client.is_revoked(token) is True
+        assert self.client.is_revoked(other) is False
+        self.mock_cognito_client.global_sign_out.assert_called_once_with(AccessToken=token)
+    
+    def test_logout_failure_does_not_revoke(self):
+        """Cognitoがサインアウトを拒否した場合はローカルでも失効させないことをテスト"""
+        self.mock_cognito_client.global_sign_out.side_effect = ClientError(
+            error_response={
+                'Error': {
+                    'Code': 'NotAuthorizedException',
+                    'Message': 'Invalid Access Token'
+                }
+            },
+            operation_name='GlobalSignOut'
+        )
+        token = jwt.encode({'jti': 'jti-123', 'exp': int(time.time()) + 3600}, 'forged', algorithm='HS256')
+        
+        with pytest.raises(AuthenticationError):
+            self.client.logout(token)
+        
+        assert self.client.is_revoked(token) is False
+        assert utils.cognito._REVOKED_JTIS == {}
+    
+    def test_logout_revocation_expiry_capped(self):
+        """失効情報の保持期限が上限で切り詰められることをテスト"""
+        self.mock_cognito_client.global_sign_out.return_value = {}
+        token = jwt.encode({'jti': 'jti-123', 'exp': int(time.time()) + 10 ** 9}, 'secret', algorithm='HS256')
+        
+        self.client.logout(token)
+        
+        assert utils.cognito._REVOKED_JTIS['jti-123'] <= time.time() + utils.cognito._REVOKED_JTI_MAX_TTL
+    
+    def test_is_revoked_non_jwt(self):
+        """JWTとして解析できないトークンは失効扱いにしないことをテスト"""
+        assert self.client.is_revoked('access_token_123') is False
+    
     def test_logout_missing_token(self):
         """アクセストークン不足のテスト"""
         with pytest.raises(ValidationError, match="Access token is required"):
@@ -210,7 +335,7 @@ class TestGetUserInfo:
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
         self.mock_cognito_client = Mock()
-        with patch('utils.cognito.boto3.client', return_value=self.mock_cognito_client):
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
             self.client = CognitoClient(
                 user_pool_id='test_pool',
                 client_id='test_client'
@@ -243,19 +368,94 @@ class TestGetUserInfo:
             AccessToken='access_token_123'
         )
     
+    def test_get_user_info_cached(self):
+        """同じトークンのユーザー情報がキャッシュされることをテスト"""
+        self.mock_cognito_client.get_user.return_value = {
+            'Username': 'test@example.com',
+            'UserAttributes': [{'Name': 'sub', 'Value': 'user123'}]
+        }
+        
+        first = self.client.get_user_info('access_token_123')
+        second = self.client.get_user_info('access_token_123')
+        
+        assert first == second
+        self.mock_cognito_client.get_user.assert_called_once()
+        # 生のトークンはキャッシュキーに含めない
+        assert b'access_token_123' not in utils.cognito._USER_CACHE
+    
+    def test_get_user_info_cache_expires(self, monkeypatch):
+        """TTL経過後はユーザー情報を再取得することをテスト"""
+        self.mock_cognito_client.get_user.return_value = {'Username': 'test@example.com'}
+        now = [1000.0]
+        monkeypatch.setattr('utils.cognito.time.monotonic', lambda: now[0])
+        
+        self.client.get_user_info('access_token_123')
+        now[0] += utils.cognito._USER_CACHE_TTL
+        self.client.get_user_info('access_token_123')
+        
+        assert self.mock_cognito_client.get_user.call_count == 2
+    
     def test_get_user_info_missing_token(self):
         """アクセストークン不足のテスト"""
         with pytest.raises(ValidationError, match="Access token is required"):
             self.client.get_user_info('')
 
 
+class TestGetUserInfoFromToken:
+    """get_user_info_from_token メソッドのテスト"""
+    
+    def setup_method(self):
+        """各テストメソッドの前に実行される設定"""
+        self.mock_cognito_client = Mock()
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
+            self.client = CognitoClient(
+                user_pool_id='ap-northeast-1_test123',
+                client_id='test_client'
+            )
+    
+    @patch('utils.auth.TokenValidator.validate_token')
+    def test_get_user_info_from_token_success(self, mock_validate_token):
+        """トークンのクレームからユーザー情報を取得できることをテスト"""
+        mock_validate_token.return_value = {
+            'sub': 'user123',
+            'username': 'testuser',
+            'token_use': 'access'
+        }
+        
+        result = self.client.get_user_info_from_token('valid.jwt.token')
+        
+        assert result['user_id'] == 'user123'
+        assert result['username'] == 'testuser'
+        assert result['email'] is None
+        assert result['attributes']['email_verified'] is None
+        mock_validate_token.assert_called_once_with('valid.jwt.token')
+        self.mock_cognito_client.get_user.assert_not_called()
+    
+    @patch('utils.auth.TokenValidator.validate_token')
+    def test_get_user_info_from_token_revoked(self, mock_validate_token):
+        """ログアウト済みのトークンを拒否することをテスト"""
+        mock_validate_token.return_value = {'sub': 'user123', 'jti': 'jti-123'}
+        utils.cognito._REVOKED_JTIS['jti-123'] = time.time() + 3600
+        
+        with pytest.raises(AuthorizationError, match="トークンが無効です"):
+            self.client.get_user_info_from_token('valid.jwt.token')
+    
+    @patch('utils.auth.TokenValidator.validate_token')
+    def test_get_user_info_from_token_invalid(self, mock_validate_token):
+        """無効なトークンで例外が伝播することをテスト"""
+        mock_validate_token.side_effect = AuthorizationError("トークンが無効です")
+        
+        with pytest.raises(AuthorizationError, match="トークンが無効です"):
+            self.client.get_user_info_from_token('invalid.jwt.token')
+
+
 class TestCreateUser:
     """create_user メソッドのテスト"""
     
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
         self.mock_cognito_client = Mock()
-        with patch('utils.cognito.boto3.client', return_value=self.mock_cognito_client):
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
             self.client = CognitoClient(
                 user_pool_id='test_pool',
                 client_id='test_client'
@@ -336,13 +536,51 @@ class TestCreateUser:
             self.client.create_user('existing@example.com', 'password123')
 
 
+class TestCreateUsers:
+    """create_users メソッドのテスト"""
+    
+    def setup_method(self):
+        """各テストメソッドの前に実行される設定"""
+        self.mock_cognito_client = Mock()
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
+            self.client = CognitoClient(
+                user_pool_id='test_pool',
+                client_id='test_client'
+            )
+    
+    def test_create_users_success(self):
+        """複数ユーザーの作成結果が入力順に返されることをテスト"""
+        self.mock_cognito_client.admin_create_user.side_effect = lambda **kwargs: {
+            'User': {'Username': kwargs['Username'], 'UserStatus': 'FORCE_CHANGE_PASSWORD'}
+        }
+        users = [
+            {'email': f'user{i}@example.com', 'password': 'TempPass123!'}
+            for i in range(5)
+        ]
+        
+        results = self.client.create_users(users)
+        
+        assert [result['user_id'] for result in results] == [user['email'] for user in users]
+        assert self.mock_cognito_client.admin_create_user.call_count == 5
+    
+    def test_create_users_empty(self):
+        """空のリストではAPIを呼び出さないことをテスト"""
+        assert self.client.create_users([]) == []
+        self.mock_cognito_client.admin_create_user.assert_not_called()
+    
+    def test_create_users_propagates_error(self):
+        """作成に失敗したユーザーがあれば例外が発生することをテスト"""
+        with pytest.raises(ValidationError, match="Email and password are required"):
+            self.client.create_users([{'email': '', 'password': 'TempPass123!'}])
+
+
 class TestDeleteUser:
     """delete_user メソッドのテスト"""
     
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
         self.mock_cognito_client = Mock()
-        with patch('utils.cognito.boto3.client', return_value=self.mock_cognito_client):
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
             self.client = CognitoClient(
                 user_pool_id='test_pool',
                 client_id='test_client'
@@ -384,6 +622,37 @@ class TestDeleteUser:
             self.client.delete_user('nonexistent@example.com')
 
 
+class TestDeleteUsers:
+    """delete_users メソッドのテスト"""
+    
+    def setup_method(self):
+        """各テストメソッドの前に実行される設定"""
+        self.mock_cognito_client = Mock()
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
+            self.client = CognitoClient(
+                user_pool_id='test_pool',
+                client_id='test_client'
+            )
+    
+    def test_delete_users_success(self):
+        """複数ユーザーの削除結果が入力順に返されることをテスト"""
+        self.mock_cognito_client.admin_delete_user.return_value = {}
+        emails = [f'user{i}@example.com' for i in range(5)]
+        
+        results = self.client.delete_users(emails)
+        
+        assert [result['message'] for result in results] == [
+            f"User {email} successfully deleted" for email in emails
+        ]
+        deleted = {call.kwargs['Username'] for call in self.mock_cognito_client.admin_delete_user.call_args_list}
+        assert deleted == set(emails)
+    
+    def test_delete_users_empty(self):
+        """空のリストではAPIを呼び出さないことをテスト"""
+        assert self.client.delete_users([]) == []
+        self.mock_cognito_client.admin_delete_user.assert_not_called()
+
+
 class TestHelperFunctions:
     """ヘルパー関数のテスト"""
     
@@ -391,7 +660,7 @@ class TestHelperFunctions:
         'COGNITO_USER_POOL_ID': 'ap-northeast-1_helper_test',
         'COGNITO_CLIENT_ID': 'helper_client_id'
     })
-    @patch('utils.cognito.boto3.client')
+    @patch('botocore.session.Session.create_client')
     def test_get_cognito_client(self, mock_boto_client):
         """get_cognito_client関数のテスト"""
         mock_client = Mock()
@@ -402,6 +671,133 @@ class TestHelperFunctions:
         assert isinstance(client, CognitoClient)
         assert client.user_pool_id == 'ap-northeast-1_helper_test'
         assert client.client_id == 'helper_client_id'
+        assert get_cognito_client() is client
+        mock_boto_client.assert_called_once()
+
+
+class TestRateLimiting:
+    """レートリミッターのテスト"""
+    
+    def setup_method(self):
+        """各テストメソッドの前に実行される設定"""
+        self.mock_cognito_client = Mock()
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
+            self.client = CognitoClient(
+                user_pool_id='test_pool',
+                client_id='test_client'
+            )
+    
+    def test_token_bucket_refills_over_time(self, monkeypatch):
+        """トークンが時間経過で補充されることをテスト"""
+        now = [1000.0]
+        monkeypatch.setattr('utils.cognito.time.monotonic', lambda: now[0])
+        bucket = _TokenBucket(capacity=2, rate=1)
+        
+        assert bucket.acquire() is True
+        assert bucket.acquire() is True
+        assert bucket.acquire() is False
+        
+        now[0] += 1
+        assert bucket.acquire() is True
+    
+    def test_token_bucket_waits_within_timeout(self, monkeypatch):
+        """タイムアウト内に補充される場合は待機して取得することをテスト"""
+        now = [1000.0]
+        monkeypatch.setattr('utils.cognito.time.monotonic', lambda: now[0])
+        monkeypatch.setattr('utils.cognito.time.sleep', lambda seconds: now.__setitem__(0, now[0] + seconds))
+        bucket = _TokenBucket(capacity=1, rate=2)
+        
+        assert bucket.acquire() is True
+        assert bucket.acquire(timeout=1.0) is True
+        assert now[0] == pytest.approx(1000.5)
+    
+    def test_rate_limit_exceeded(self, monkeypatch):
+        """上限を超えた場合はCognitoを呼び出さずにServiceErrorとなることをテスト"""
+        bucket = _TokenBucket(capacity=1, rate=0.01)
+        monkeypatch.setattr(utils.cognito, '_get_rate_limiter', lambda: bucket)
+        self.mock_cognito_client.admin_delete_user.return_value = {}
+        
+        self.client.delete_user('user1@example.com')
+        with pytest.raises(ServiceError, match="リクエストが多すぎます") as exc_info:
+            self.client.delete_user('user2@example.com')
+        
+        assert exc_info.value.error_code == 'TooManyRequestsException'
+        self.mock_cognito_client.admin_delete_user.assert_called_once()
+    
+    def test_authenticate_not_rate_limited_by_default(self, monkeypatch):
+        """既定ではauthenticateにレート制限を適用しないことをテスト"""
+        bucket = _TokenBucket(capacity=1, rate=0.01)
+        monkeypatch.setattr(utils.cognito, '_get_rate_limiter', lambda: bucket)
+        self.mock_cognito_client.initiate_auth.return_value = {'AuthenticationResult': {}}
+        
+        for _ in range(3):
+            self.client.authenticate('test@example.com', 'password123')
+        
+        assert self.mock_cognito_client.initiate_auth.call_count == 3
+    
+    @patch.dict(os.environ, {'COGNITO_RATE_LIMIT_AUTHENTICATE': 'true'})
+    def test_authenticate_rate_limited_when_enabled(self, monkeypatch):
+        """設定で有効化した場合はauthenticateにもレート制限を適用することをテスト"""
+        utils.cognito._load_config.cache_clear()
+        bucket = _TokenBucket(capacity=1, rate=0.01)
+        monkeypatch.setattr(utils.cognito, '_get_rate_limiter', lambda: bucket)
+        self.mock_cognito_client.initiate_auth.return_value = {'AuthenticationResult': {}}
+        
+        self.client.authenticate('test@example.com', 'password123')
+        with pytest.raises(ServiceError, match="リクエストが多すぎます"):
+            self.client.authenticate('test@example.com', 'password123')
+    
+    @patch.dict(os.environ, {'COGNITO_RATE_LIMIT_PER_MINUTE': '600', 'COGNITO_RATE_LIMIT_BURST': '5'})
+    def test_rate_limiter_configurable(self):
+        """レート制限の上限を環境変数で設定できることをテスト"""
+        utils.cognito._load_config.cache_clear()
+        
+        limiter = utils.cognito._get_rate_limiter()
+        
+        assert limiter.capacity == 5
+        assert limiter.rate == 10
+    
+    @patch.dict(os.environ, {'COGNITO_RATE_LIMIT_PER_MINUTE': '0'})
+    def test_rate_limiter_disabled(self):
+        """上限に0を設定するとレート制限が無効になることをテスト"""
+        utils.cognito._load_config.cache_clear()
+        
+        assert utils.cognito._get_rate_limiter() is None
+    
+    @pytest.mark.parametrize("name,value", [
+        ('COGNITO_RATE_LIMIT_PER_MINUTE', 'fast'),
+        ('COGNITO_RATE_LIMIT_BURST', '10x'),
+        ('COGNITO_RATE_LIMIT_AUTHENTICATE', 'maybe'),
+    ])
+    def test_rate_limit_config_invalid(self, name, value):
+        """レート制限の設定値が不正な場合は変数名を含むValidationErrorとなることをテスト"""
+        utils.cognito._load_config.cache_clear()
+        
+        with patch.dict(os.environ, {name: value}):
+            with pytest.raises(ValidationError, match=name):
+                CognitoClient(user_pool_id='test_pool', client_id='test_client')
+    
+    def test_delete_users_waits_for_rate_limit(self, monkeypatch):
+        """バケットの容量を超える一括削除でも枠が空くまで待機して完了することをテスト"""
+        clock = [1000.0]
+        clock_lock = threading.Lock()
+        
+        def fake_sleep(seconds):
+            with clock_lock:
+                clock[0] += seconds
+        
+        monkeypatch.setattr('utils.cognito.time.monotonic', lambda: clock[0])
+        monkeypatch.setattr('utils.cognito.time.sleep', fake_sleep)
+        bucket = _TokenBucket(capacity=3, rate=1)
+        monkeypatch.setattr(utils.cognito, '_get_rate_limiter', lambda: bucket)
+        self.mock_cognito_client.admin_delete_user.return_value = {}
+        emails = [f'user{i}@example.com' for i in range(20)]
+        
+        results = self.client.delete_users(emails)
+        
+        assert len(results) == 20
+        assert all(result['success'] for result in results)
+        assert self.mock_cognito_client.admin_delete_user.call_count == 20
 
 
 class TestErrorHandling:
@@ -410,7 +806,7 @@ class TestErrorHandling:
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
         self.mock_cognito_client = Mock()
-        with patch('utils.cognito.boto3.client', return_value=self.mock_cognito_client):
+        with patch('botocore.session.Session.create_client', return_value=self.mock_cognito_client):
             self.client = CognitoClient(
                 user_pool_id='test_pool',
                 client_id='test_client'
@@ -453,4 +849,65 @@ class TestErrorHandling:
         self.mock_cognito_client.initiate_auth.side_effect = Exception("Unexpected error")
         
         with pytest.raises(ServiceError, match="Unexpected error during authentication"):
-            self.client.authenticate('test@example.com', 'password123')
\ No newline at end of file
+            self.client.authenticate('test@example.com', 'password123')
+    
+    def test_authorization_error_handling(self):
+        """認可エラーのハンドリングテスト"""
+        error = ClientError(
+            error_response={
+                'Error': {
+                    'Code': 'AccessDeniedException',
+                    'Message': 'Access denied.'
+                }
+            },
+            operation_name='InitiateAuth'
+        )
+        self.mock_cognito_client.initiate_auth.side_effect = error
+        
+        with pytest.raises(AuthorizationError, match="アクセスが拒否されました") as exc_info:
+            self.client.authenticate('test@example.com', 'password123')
+        
+        assert exc_info.value.error_code == 'AccessDeniedException'
+        assert exc_info.value.original_error is error
+    
+    def test_unknown_error_code_handling(self):
+        """未知のエラーコードのハンドリングテスト"""
+        error = ClientError(
+            error_response={
+                'Error': {
+                    'Code': 'SomeNewException',
+                    'Message': 'Something {odd} happened.'
+                }
+            },
+            operation_name='InitiateAuth'
+        )
+        self.mock_cognito_client.initiate_auth.side_effect = error
+        
+        with pytest.raises(ServiceError, match="予期しないエラーが発生しました: Something {odd} happened."):
+            self.client.authenticate('test@example.com', 'password123')
+
+
+class TestCognitoErrorSerialization:
+    """Cognito例外のコピーとシリアライズのテスト"""
+    
+    @pytest.mark.parametrize("error_class", [
+        CognitoError, AuthenticationError, AuthorizationError, ValidationError, ServiceError
+    ])
+    @pytest.mark.parametrize("duplicate", [
+        copy.copy,
+        copy.deepcopy,
+        lambda error: pickle.loads(pickle.dumps(error)),
+    ], ids=["copy", "deepcopy", "pickle"])
+    def test_error_attributes_preserved(self, error_class, duplicate):
+        """コピーやpickleの往復で例外の属性が失われないことをテスト"""
+        original = ValueError("original")
+        error = error_class("エラーメッセージ", "SomeErrorCode", original)
+        
+        restored = duplicate(error)
+        
+        assert type(restored) is error_class
+        assert restored.message == "エラーメッセージ"
+        assert restored.error_code == "SomeErrorCode"
+        assert isinstance(restored.original_error, ValueError)
+        assert restored.original_error.args == ("original",)
+        assert str(restored) == "エラーメッセージ"
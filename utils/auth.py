@@ -4,22 +4,120 @@
 JWT トークン検証、HTTPヘッダーからのトークン抽出、認証エラーハンドリングを提供する
 """
 import re
+import time
+import hashlib
 import logging
+import functools
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 import jwt
+import orjson
 from jwt.exceptions import (
     DecodeError, 
     ExpiredSignatureError, 
     InvalidTokenError,
     InvalidSignatureError
 )
-import requests
-from requests.exceptions import RequestException
 
-from utils.cognito import AuthenticationError, AuthorizationError, ValidationError, ServiceError
+from utils.cognito import AuthenticationError, AuthorizationError, ValidationError, ServiceError, is_jti_revoked
 
 logger = logging.getLogger(__name__)
 
+# JWKS のキャッシュ有効期間（Cache-Control: max-age が無い場合の既定値、秒）
+_JWKS_DEFAULT_MAX_AGE = 3600
+
+# 未知の key id による JWKS の再取得を行わない最短間隔（秒）
+# 任意の key id を持つトークンでキャッシュを無効化されないようにする
+_JWKS_MIN_REFRESH_INTERVAL = 60
+
+# (リージョン, ユーザープールID) ごとの (key id をキーとした公開鍵, 有効期限, 取得時刻)
+# TokenValidator のインスタンスをまたいで Lambda コンテナ内で共有する
+_JWKS_CACHE: Dict[Tuple[str, str], Tuple[Dict[str, Any], float, float]] = {}
+_JWKS_LOCK = threading.Lock()
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+# レスポンス共通のCORSヘッダー（全レスポンスで共有するため変更しないこと）
+# Lambda ランタイムが json.dumps で直列化するため MappingProxyType ではなく dict のまま保持する
+_CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
+    "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS"
+}
+
+# エラー型ごとの (HTTPステータスコード, エラータイプ)
+_ERROR_MAP = {
+    ValidationError: (400, "BadRequest"),
+    AuthenticationError: (401, "AuthenticationFailed"),
+    AuthorizationError: (401, "Unauthorized"),
+    ServiceError: (503, "ServiceUnavailable"),
+}
+
+# 検証済みトークンのキャッシュ（(JWKS URL, トークンのSHA-256) -> _CachedToken）
+# 生のトークンは保持せず、有効期限の _TOKEN_CACHE_SKEW 秒前まで再利用する
+_TOKEN_CACHE: "OrderedDict[Tuple[str, bytes], _CachedToken]" = OrderedDict()
+_TOKEN_CACHE_MAX = 1024
+_TOKEN_CACHE_SKEW = 30
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Cognito のトークンは通常 1〜2KB 程度のため、これを超えるものは検証せずに拒否する
+_MAX_TOKEN_LENGTH = 8192
+
+# JWKS 取得用のHTTPセッション（初回の JWKS 取得時に _get_session で作成する）
+_SESSION = None
+
+# JWKS 取得のタイムアウト（接続, 読み込み）秒
+_JWKS_TIMEOUT = (1.0, 3.0)
+
+
+def _get_session():
+    """
+    JWKS 取得用のHTTPセッションを取得
+    
+    Lambda コンテナ内で TCP/TLS 接続を再利用する。requests の読み込みは
+    コールドスタート時間に影響するため、JWKS を初めて取得する時点まで遅らせる
+    
+    Returns:
+        requests.Session: 共有HTTPセッション
+    """
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=(500, 502, 503, 504))
+        ))
+        _SESSION = session
+    
+    return _SESSION
+
+
+class _CachedToken:
+    """検証済みトークンのキャッシュエントリ"""
+    
+    __slots__ = ('payload', 'exp', 'user_info')
+    
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.exp = payload['exp']
+        # validate_and_extract_user_info で抽出したユーザー情報
+        self.user_info = None
+    
+    def is_fresh(self) -> bool:
+        """キャッシュを利用できる有効期限内かどうか"""
+        return self.exp - _TOKEN_CACHE_SKEW > time.time()
+
+
+def _token_cache_key(jwks_url: str, token: str) -> Tuple[str, bytes]:
+    """トークンキャッシュのキーを作成（生のトークンの代わりにハッシュを使用）"""
+    return (jwks_url, hashlib.sha256(token.encode()).digest())
+
 
 class TokenValidator:
     """
@@ -28,6 +126,9 @@ class TokenValidator:
     Cognito JWT トークンの検証を行い、トークンの有効性とユーザー情報を確認する
     """
     
+    # JWKS と検証済みトークンはモジュールレベルでキャッシュするため、インスタンスは設定値のみを持つ
+    __slots__ = ('user_pool_id', 'region', 'jwks_url')
+    
     def __init__(self, user_pool_id: str, region: str = 'ap-northeast-1'):
         """
         トークン検証の初期化
@@ -39,7 +140,6 @@ class TokenValidator:
         self.user_pool_id = user_pool_id
         self.region = region
         self.jwks_url = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
-        self._jwks_cache = None
     
     def validate_token(self, token: str) -> Dict[str, Any]:
         """
@@ -59,6 +159,19 @@ class TokenValidator:
         if not token:
             raise ValidationError("Token is required")
         
+        # 明らかに不正な形式のトークンはJWKS取得や署名検証の前に拒否する
+        if len(token) > _MAX_TOKEN_LENGTH or token.count('.') != 2:
+            raise AuthorizationError("トークンが無効です")
+        
+        # 同じトークンの署名検証は有効期限内であれば省略する
+        cache_key = _token_cache_key(self.jwks_url, token)
+        cached = _TOKEN_CACHE.get(cache_key)
+        if cached is not None and cached.is_fresh():
+            with _TOKEN_CACHE_LOCK:
+                if cache_key in _TOKEN_CACHE:
+                    _TOKEN_CACHE.move_to_end(cache_key)
+            return cached.payload
+        
         try:
             # JWTヘッダーを取得してkey idを確認
             unverified_header = jwt.get_unverified_header(token)
@@ -88,6 +201,7 @@ class TokenValidator:
             if token_use != 'access':
                 raise AuthorizationError("トークンが無効です")
             
+            self._cache_payload(cache_key, payload)
             return payload
             
         except ExpiredSignatureError:
@@ -101,10 +215,32 @@ class TokenValidator:
             logger.error(f"Token validation error: {str(e)}")
             raise ServiceError(f"トークン検証中にエラーが発生しました: {str(e)}")
     
+    def _cache_payload(self, cache_key: Tuple[str, bytes], payload: Dict[str, Any]) -> None:
+        """
+        検証済みのペイロードをキャッシュ
+        
+        Args:
+            cache_key: (JWKS URL, トークンのSHA-256) のキャッシュキー
+            payload: 検証済みのトークンペイロード
+        """
+        exp = payload.get('exp')
+        if not isinstance(exp, (int, float)) or exp - _TOKEN_CACHE_SKEW <= time.time():
+            return
+        
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[cache_key] = _CachedToken(payload)
+            _TOKEN_CACHE.move_to_end(cache_key)
+            if len(_TOKEN_CACHE) > _TOKEN_CACHE_MAX:
+                _TOKEN_CACHE.popitem(last=False)
+    
     def _get_public_key(self, kid: str) -> str:
         """
         JWKS から公開鍵を取得
         
+        JWKS は Cache-Control の max-age に従ってキャッシュし、
+        キャッシュに無い key id の場合は鍵ローテーションを考慮して再取得するが、
+        直近 _JWKS_MIN_REFRESH_INTERVAL 秒以内に取得済みであれば再取得しない
+        
         Args:
             kid: Key ID
             
@@ -115,21 +251,84 @@ class TokenValidator:
             ServiceError: JWKS取得に失敗した場合
             AuthorizationError: 指定されたkey idが見つからない場合
         """
-        if not self._jwks_cache:
+        # キャッシュヒット時はロックを取らずに参照する
+        cached = _JWKS_CACHE.get((self.region, self.user_pool_id))
+        if cached:
+            now = time.monotonic()
+            if now < cached[1]:
+                public_key = cached[0].get(kid)
+                if public_key is not None:
+                    return public_key
+                if now - cached[2] < _JWKS_MIN_REFRESH_INTERVAL:
+                    raise AuthorizationError("トークンが無効です")
+        
+        public_key = self._refresh_jwks(cached).get(kid)
+        if public_key is None:
+            raise AuthorizationError("トークンが無効です")
+        
+        return public_key
+    
+    def _refresh_jwks(self, stale: Optional[Tuple[Dict[str, Any], float, float]] = None) -> Dict[str, Any]:
+        """
+        JWKS を取得して key id ごとの公開鍵をキャッシュ
+        
+        同時に複数の呼び出しがあった場合は最初の一つだけが取得し、
+        ロック待ちの間に他の呼び出しが更新したキャッシュはそのまま利用する
+        
+        Args:
+            stale: 呼び出し元がロック取得前に参照したキャッシュエントリ
+            
+        Returns:
+            key id をキーとした公開鍵の辞書
+            
+        Raises:
+            ServiceError: JWKS取得に失敗した場合
+        """
+        from requests.exceptions import RequestException
+        
+        with _JWKS_LOCK:
+            current = _JWKS_CACHE.get((self.region, self.user_pool_id))
+            if current is not None and current is not stale and time.monotonic() < current[1]:
+                return current[0]
+            
             try:
-                response = requests.get(self.jwks_url, timeout=10)
+                response = _get_session().get(self.jwks_url, timeout=_JWKS_TIMEOUT)
                 response.raise_for_status()
-                self._jwks_cache = response.json()
-            except RequestException as e:
+                jwks = orjson.loads(response.content)
+            except (RequestException, orjson.JSONDecodeError) as e:
                 raise ServiceError(f"JWKS取得に失敗しました: {str(e)}")
+            
+            # JWK形式からPEM形式への変換は取得時に一度だけ行う
+            # PyJWKClient と同様に署名用の鍵（use が sig または未指定）のみを対象とする
+            keys_by_kid = {
+                key['kid']: jwt.algorithms.RSAAlgorithm.from_jwk(key)
+                for key in jwks.get('keys', [])
+                if key.get('kid') and key.get('kty') == 'RSA' and key.get('use', 'sig') == 'sig'
+            }
+            
+            match = _MAX_AGE_RE.search(response.headers.get('Cache-Control') or '')
+            max_age = int(match.group(1)) if match else _JWKS_DEFAULT_MAX_AGE
+            now = time.monotonic()
+            _JWKS_CACHE[(self.region, self.user_pool_id)] = (keys_by_kid, now + max_age, now)
         
-        # 指定されたkey idを検索
-        for key in self._jwks_cache.get('keys', []):
-            if key.get('kid') == kid:
-                # JWK形式からPEM形式に変換
-                return jwt.algorithms.RSAAlgorithm.from_jwk(key)
+        return keys_by_kid
+
+
+@functools.lru_cache(maxsize=8)
+def _get_validator(user_pool_id: str, region: str) -> TokenValidator:
+    """
+    ユーザープールごとの TokenValidator を取得
+    
+    Lambda のウォームスタート間でインスタンスを再利用し、JWKS キャッシュを保持する
+    
+    Args:
+        user_pool_id: CognitoユーザープールID
+        region: AWSリージョン
         
-        raise AuthorizationError("トークンが無効です")
+    Returns:
+        TokenValidator: キャッシュされたトークン検証インスタンス
+    """
+    return TokenValidator(user_pool_id, region)
 
 
 def extract_token_from_header(authorization_header: str) -> str:
@@ -149,18 +348,33 @@ def extract_token_from_header(authorization_header: str) -> str:
     if not authorization_header:
         raise ValidationError("認証が必要です")
     
-    # Bearer トークンの形式を確認
-    bearer_pattern = re.compile(r'^Bearer\s+(.+)$', re.IGNORECASE)
-    match = bearer_pattern.match(authorization_header.strip())
+    return _parse_bearer(authorization_header)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_bearer(authorization_header: str) -> str:
+    """
+    Bearer 形式の Authorization ヘッダーからトークン部分を取り出す
     
-    if not match:
-        raise AuthorizationError("認証ヘッダーが無効です")
+    同じクライアントから繰り返し送られるヘッダーの解析結果をキャッシュする。
+    キャッシュは maxsize で上限があり、プロセス内にのみ保持されるため
+    Lambda コンテナの生存期間を超えてトークンが残ることはない
     
-    token = match.group(1)
-    if not token:
+    Args:
+        authorization_header: HTTP Authorization ヘッダーの値
+        
+    Returns:
+        抽出されたトークン
+        
+    Raises:
+        AuthorizationError: ヘッダーが無効な形式の場合
+    """
+    # "Bearer" + 空白 + トークン の形式を確認（大文字小文字を区別しない）
+    header = authorization_header.strip()
+    if len(header) <= 7 or header[:6].lower() != 'bearer' or not header[6].isspace():
         raise AuthorizationError("認証ヘッダーが無効です")
     
-    return token
+    return header[7:].lstrip()
 
 
 def extract_token_from_event(event: Dict[str, Any]) -> str:
@@ -177,14 +391,17 @@ def extract_token_from_event(event: Dict[str, Any]) -> str:
         AuthorizationError: トークンが無効な形式の場合
         ValidationError: トークンが提供されていない場合
     """
-    headers = event.get('headers', {})
+    # API Gateway はヘッダーが無い場合に null を渡すことがある
+    headers = event.get('headers') or {}
     
-    # Authorization ヘッダーを検索（大文字小文字を区別しない）
-    auth_header = None
-    for key, value in headers.items():
-        if key.lower() == 'authorization':
-            auth_header = value
-            break
+    # Authorization ヘッダーを検索（API Gateway が渡す一般的な表記を先に確認する）
+    auth_header = headers.get('Authorization') or headers.get('authorization')
+    if auth_header is None:
+        # 大文字小文字が混在したヘッダー名にも対応
+        auth_header = next(
+            (value for key, value in headers.items() if key.lower() == 'authorization'),
+            None
+        )
     
     if not auth_header:
         raise ValidationError("認証が必要です")
@@ -192,6 +409,17 @@ def extract_token_from_event(event: Dict[str, Any]) -> str:
     return extract_token_from_header(auth_header)
 
 
+def _reject_revoked(payload: Dict[str, Any]) -> None:
+    """
+    このコンテナ内でログアウト済みのトークンを拒否
+    
+    Raises:
+        AuthorizationError: ログアウト済みのトークンの場合
+    """
+    if is_jti_revoked(payload.get('jti')):
+        raise AuthorizationError("トークンが無効です")
+
+
 def validate_and_extract_user_info(token: str, user_pool_id: str, region: str = 'ap-northeast-1') -> Dict[str, Any]:
     """
     トークンを検証してユーザー情報を抽出
@@ -202,7 +430,7 @@ def validate_and_extract_user_info(token: str, user_pool_id: str, region: str =
         region: AWSリージョン
         
     Returns:
-        ユーザー情報
+        ユーザー情報（同じトークンではキャッシュされた辞書を共有するため変更しないこと）
         
     Raises:
         AuthorizationError: トークンが無効または期限切れの場合
@@ -215,20 +443,36 @@ def validate_and_extract_user_info(token: str, user_pool_id: str, region: str =
     if not user_pool_id:
         raise ValidationError("User pool ID is required")
     
-    validator = TokenValidator(user_pool_id, region)
+    validator = _get_validator(user_pool_id, region)
+    
+    # 検証済みトークンであれば抽出済みのユーザー情報をそのまま返す
+    cache_key = _token_cache_key(validator.jwks_url, token)
+    cached = _TOKEN_CACHE.get(cache_key)
+    if cached is not None and cached.user_info is not None and cached.is_fresh():
+        _reject_revoked(cached.payload)
+        return cached.user_info
+    
     payload = validator.validate_token(token)
+    _reject_revoked(payload)
+    scope = payload.get('scope')
     
     # ユーザー情報を抽出
-    return {
+    user_info = {
         "user_id": payload.get('sub'),
         "username": payload.get('username'),
         "client_id": payload.get('client_id'),
         "token_use": payload.get('token_use'),
-        "scope": payload.get('scope', '').split() if payload.get('scope') else [],
+        "scope": scope.split() if scope else [],
         "auth_time": payload.get('auth_time'),
         "iat": payload.get('iat'),
         "exp": payload.get('exp')
     }
+    
+    cached = _TOKEN_CACHE.get(cache_key)
+    if cached is not None:
+        cached.user_info = user_info
+    
+    return user_info
 
 
 def require_authentication(event: Dict[str, Any], user_pool_id: str, region: str = 'ap-northeast-1') -> Dict[str, Any]:
@@ -257,6 +501,44 @@ def require_authentication(event: Dict[str, Any], user_pool_id: str, region: str
     return validate_and_extract_user_info(token, user_pool_id, region)
 
 
+@functools.lru_cache(maxsize=32)
+def _resolve_error_type(error_class: type) -> Tuple[int, str]:
+    """
+    エラー型に対応する (HTTPステータスコード, エラータイプ) を解決
+    
+    サブクラスは基底クラスまで MRO を辿り、結果はエラー型ごとにキャッシュする
+    
+    Args:
+        error_class: 発生したエラーの型
+        
+    Returns:
+        (HTTPステータスコード, エラータイプ)
+    """
+    for cls in error_class.__mro__:
+        mapped = _ERROR_MAP.get(cls)
+        if mapped is not None:
+            return mapped
+    
+    return 500, "InternalServerError"
+
+
+def _dump_body(data: Any) -> str:
+    """
+    レスポンスボディをJSON文字列にシリアライズ
+    
+    Lambdaプロキシ統合では body は文字列である必要があるため、ここで一度だけ変換する。
+    datetime 等は orjson がそのまま扱い、それ以外の未知の型は str() で文字列化する。
+    json.dumps と同様に文字列以外の辞書キーも文字列に変換する。
+    
+    Args:
+        data: レスポンスデータ
+        
+    Returns:
+        JSON文字列
+    """
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def create_auth_error_response(error: Exception, status_code: int = None) -> Dict[str, Any]:
     """
     認証エラー用のHTTPレスポンスを作成
@@ -268,36 +550,17 @@ def create_auth_error_response(error: Exception, status_code: int = None) -> Dic
     Returns:
         Lambda関数用のHTTPレスポンス
     """
-    if isinstance(error, ValidationError):
-        default_status = 400
-        error_type = "BadRequest"
-    elif isinstance(error, AuthenticationError):
-        default_status = 401
-        error_type = "AuthenticationFailed"
-    elif isinstance(error, AuthorizationError):
-        default_status = 401
-        error_type = "Unauthorized"
-    elif isinstance(error, ServiceError):
-        default_status = 503
-        error_type = "ServiceUnavailable"
-    else:
-        default_status = 500
-        error_type = "InternalServerError"
+    default_status, error_type = _resolve_error_type(type(error))
     
     response_status = status_code or default_status
     
     return {
         "statusCode": response_status,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
-            "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS"
-        },
-        "body": {
+        "headers": _CORS_HEADERS,
+        "body": _dump_body({
             "error": error_type,
             "message": str(error)
-        }
+        })
     }
 
 
@@ -314,11 +577,6 @@ def create_success_response(data: Dict[str, Any], status_code: int = 200) -> Dic
     """
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
-            "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS"
-        },
-        "body": data
+        "headers": _CORS_HEADERS,
+        "body": _dump_body(data)
     }
\ No newline at end of file
@@ -4,46 +4,416 @@ Cognito API Client Wrapper
 AWS Cognito API呼び出しの抽象化、エラーハンドリング、レスポンス正規化を提供する
 """
 import os
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-import boto3
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from botocore.exceptions import ClientError
-from dotenv import load_dotenv
 
 
-# 環境変数の読み込み
-load_dotenv()
+# 環境変数の読み込み（Lambda 上では環境変数が設定済みのため .env は読み込まない）
+if os.getenv('AWS_EXECUTION_ENV') is None:
+    from dotenv import load_dotenv
+    load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# GetUser の結果キャッシュ（アクセストークンのSHA-256 -> (正規化済みユーザー情報, 期限)）
+# 生のトークンは保持せず、ウォームスタート中の短時間だけ再利用する
+_USER_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_USER_CACHE_MAX = 1024
+_USER_CACHE_TTL = 60
+_USER_CACHE_LOCK = threading.Lock()
+
+
+def _user_cache_key(access_token: str) -> bytes:
+    """ユーザー情報キャッシュのキーを作成"""
+    return hashlib.sha256(access_token.encode()).digest()
+
+
+# ログアウト済みトークンの jti -> 失効情報を保持する期限（UNIX時間）
+# GlobalSignOut に成功したトークンを、同じコンテナ内のローカル検証でも無効として扱う
+_REVOKED_JTIS: Dict[str, float] = {}
+_REVOKED_JTIS_MAX = 100_000
+# 失効情報を保持する最長期間（秒）。Cognito のアクセストークンの既定の有効期間に合わせる
+_REVOKED_JTI_MAX_TTL = 3600
+_REVOKED_JTIS_LOCK = threading.Lock()
+
+
+def _unverified_claims(access_token: str) -> Dict[str, Any]:
+    """
+    署名を検証せずにトークンのクレームを取得
+    
+    失効リストの照合にのみ使用し、トークンの正当性の判断には使用しないこと
+    
+    Args:
+        access_token: JWTアクセストークン
+        
+    Returns:
+        クレーム（JWTとして解析できない場合は空の辞書）
+    """
+    import jwt
+    
+    try:
+        return jwt.decode(access_token, options={"verify_signature": False})
+    except jwt.exceptions.DecodeError:
+        return {}
+
+
+def _revoke(access_token: str) -> None:
+    """
+    トークンの jti を有効期限（最長 _REVOKED_JTI_MAX_TTL 秒）まで失効リストに登録
+    
+    クレームは署名を検証していないため、GlobalSignOut に成功した後にのみ呼び出すこと
+    """
+    claims = _unverified_claims(access_token)
+    jti, exp = claims.get('jti'), claims.get('exp')
+    if not jti or not isinstance(exp, (int, float)):
+        return
+    
+    now = time.time()
+    with _REVOKED_JTIS_LOCK:
+        _REVOKED_JTIS[jti] = min(exp, now + _REVOKED_JTI_MAX_TTL)
+        if len(_REVOKED_JTIS) > _REVOKED_JTIS_MAX:
+            # 期限切れのエントリを削除し、それでも上限を超える場合は古いものから削除する
+            for expired in [key for key, value in _REVOKED_JTIS.items() if value <= now]:
+                del _REVOKED_JTIS[expired]
+            while len(_REVOKED_JTIS) > _REVOKED_JTIS_MAX:
+                del _REVOKED_JTIS[next(iter(_REVOKED_JTIS))]
+
+
+def is_jti_revoked(jti: Optional[str]) -> bool:
+    """
+    jti がこのコンテナ内でログアウト済みかを確認
+    
+    Args:
+        jti: トークンの jti クレーム
+        
+    Returns:
+        ログアウト済みで、失効情報の保持期限内であれば True
+    """
+    if not jti:
+        return False
+    
+    exp = _REVOKED_JTIS.get(jti)
+    return exp is not None and exp > time.time()
+
 
 class CognitoError(Exception):
     """Cognito操作のベース例外クラス"""
+    __slots__ = ('message', 'error_code', 'original_error')
+    
     def __init__(self, message: str, error_code: str = None, original_error: Exception = None):
         self.message = message
         self.error_code = error_code
         self.original_error = original_error
         super().__init__(self.message)
+    
+    def __reduce__(self):
+        # スロットの値は BaseException.__reduce__ の args / __dict__ に含まれないため、
+        # copy や pickle で失われないようにコンストラクタ引数として渡す
+        return (type(self), (self.message, self.error_code, self.original_error))
 
 
 class AuthenticationError(CognitoError):
     """認証エラー"""
-    pass
+    __slots__ = ()
 
 
 class AuthorizationError(CognitoError):
     """認可エラー"""
-    pass
+    __slots__ = ()
 
 
 class ValidationError(CognitoError):
     """バリデーションエラー"""
-    pass
+    __slots__ = ()
 
 
 class ServiceError(CognitoError):
     """サービスエラー"""
-    pass
+    __slots__ = ()
+
+
+@dataclass(frozen=True)
+class CognitoConfig:
+    """環境変数から読み込んだCognitoの接続設定"""
+    # Python 3.9 では dataclass(slots=True) が使えないため手動で定義する
+    __slots__ = ('user_pool_id', 'client_id', 'region',
+                 'rate_limit_per_minute', 'rate_limit_burst', 'rate_limit_authenticate')
+    
+    user_pool_id: Optional[str]
+    client_id: Optional[str]
+    region: str
+    # 1分あたりのAPI呼び出し数の上限（0 以下でレート制限を無効化）
+    rate_limit_per_minute: float
+    # 連続して許容する呼び出し数
+    rate_limit_burst: float
+    # authenticate にもレート制限を適用するか
+    rate_limit_authenticate: bool
+
+
+def _getenv_float(name: str, default: float) -> float:
+    """
+    数値の環境変数を取得
+    
+    Args:
+        name: 環境変数名
+        default: 未設定の場合の既定値
+        
+    Returns:
+        環境変数の値
+        
+    Raises:
+        ValidationError: 数値として解釈できない場合
+    """
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    
+    try:
+        return float(value)
+    except ValueError as e:
+        raise ValidationError(f"{name} must be a number: {value!r}", original_error=e)
+
+
+def _getenv_bool(name: str, default: bool) -> bool:
+    """
+    真偽値の環境変数を取得（true/false, 1/0, yes/no）
+    
+    Args:
+        name: 環境変数名
+        default: 未設定の場合の既定値
+        
+    Returns:
+        環境変数の値
+        
+    Raises:
+        ValidationError: 真偽値として解釈できない場合
+    """
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    
+    normalized = value.strip().lower()
+    if normalized in ('true', '1', 'yes'):
+        return True
+    if normalized in ('false', '0', 'no'):
+        return False
+    raise ValidationError(f"{name} must be true or false: {value!r}")
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config() -> CognitoConfig:
+    """
+    環境変数からCognitoの接続設定を読み込む（プロセス内で一度だけ）
+    
+    Returns:
+        CognitoConfig: 接続設定
+    """
+    rate_limit_per_minute = _getenv_float('COGNITO_RATE_LIMIT_PER_MINUTE', 100.0)
+    return CognitoConfig(
+        user_pool_id=os.getenv('COGNITO_USER_POOL_ID'),
+        client_id=os.getenv('COGNITO_CLIENT_ID'),
+        region=os.getenv('AWS_REGION', 'ap-northeast-1'),
+        rate_limit_per_minute=rate_limit_per_minute,
+        rate_limit_burst=_getenv_float('COGNITO_RATE_LIMIT_BURST', rate_limit_per_minute),
+        rate_limit_authenticate=_getenv_bool('COGNITO_RATE_LIMIT_AUTHENTICATE', False),
+    )
+
+
+# Cognito のエラーコード -> (例外クラス, メッセージテンプレート)
+_ERROR_MAP = {
+    # 認証関連エラー
+    **dict.fromkeys(
+        ('NotAuthorizedException', 'UserNotFoundException',
+         'UserNotConfirmedException', 'PasswordResetRequiredException'),
+        (AuthenticationError, "認証に失敗しました")),
+    # 認可関連エラー
+    **dict.fromkeys(
+        ('AccessDeniedException', 'UnauthorizedOperation'),
+        (AuthorizationError, "アクセスが拒否されました")),
+    # バリデーションエラー
+    **dict.fromkeys(
+        ('InvalidParameterException', 'InvalidPasswordException',
+         'UsernameExistsException', 'AliasExistsException'),
+        (ValidationError, "リクエストが不正です: {}")),
+    # サービスエラー
+    **dict.fromkeys(
+        ('InternalErrorException', 'TooManyRequestsException',
+         'ResourceNotFoundException'),
+        (ServiceError, "サービスエラーが発生しました: {}")),
+}
+
+# その他のエラー
+_DEFAULT_ERROR = (ServiceError, "予期しないエラーが発生しました: {}")
+
+
+# _normalize_auth_response の (出力キー, AuthenticationResult のキー, デフォルト値)
+_AUTH_RESULT_FIELDS = (
+    ('access_token', 'AccessToken', None),
+    ('refresh_token', 'RefreshToken', None),
+    ('id_token', 'IdToken', None),
+    ('token_type', 'TokenType', 'Bearer'),
+    ('expires_in', 'ExpiresIn', 3600),
+)
+
+# _normalize_user_response で参照するユーザー属性
+_USER_ATTRIBUTE_NAMES = frozenset((
+    'sub', 'email', 'email_verified', 'given_name', 'family_name', 'phone_number'
+))
+
+
+class _TokenBucket:
+    """
+    スレッドセーフなトークンバケット方式のレートリミッター
+    
+    Cognito のスロットリング（TooManyRequestsException）を受けてから再試行する代わりに、
+    ローカルで呼び出し頻度を抑える
+    """
+    
+    __slots__ = ('capacity', 'rate', 'tokens', 'last_refill', 'lock')
+    
+    def __init__(self, capacity: float, rate: float):
+        """
+        Args:
+            capacity: バケットの容量（バースト時に許容する呼び出し数）
+            rate: 1秒あたりに補充するトークン数
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, timeout: Optional[float] = 0.0) -> bool:
+        """
+        トークンを一つ取得
+        
+        Args:
+            timeout: トークンが補充されるまで待機する最大秒数（None の場合は取得できるまで待機）
+            
+        Returns:
+            取得できた場合は True、タイムアウトした場合は False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            
+            if deadline is not None and wait > deadline - now:
+                return False
+            time.sleep(wait)
+
+
+# レート制限の枠が空くまで待機する既定の最大秒数
+_RATE_LIMIT_TIMEOUT = 1.0
+
+
+@functools.lru_cache(maxsize=1)
+def _get_rate_limiter() -> Optional[_TokenBucket]:
+    """
+    Cognito API 呼び出し用のレートリミッターを取得（プロセス内で共有）
+    
+    Returns:
+        レートリミッター（設定で無効化されている場合は None）
+    """
+    config = _load_config()
+    if config.rate_limit_per_minute <= 0:
+        return None
+    return _TokenBucket(capacity=max(config.rate_limit_burst, 1), rate=config.rate_limit_per_minute / 60)
+
+
+def _acquire_rate_limit(timeout: Optional[float] = _RATE_LIMIT_TIMEOUT) -> None:
+    """
+    Cognito API の呼び出し枠を取得
+    
+    Args:
+        timeout: 枠が空くまで待機する最大秒数（None の場合は空くまで待機）
+        
+    Raises:
+        ServiceError: 呼び出し頻度の上限を超えた場合
+    """
+    limiter = _get_rate_limiter()
+    if limiter is not None and not limiter.acquire(timeout=timeout):
+        raise ServiceError("リクエストが多すぎます。しばらくしてから再試行してください",
+                           "TooManyRequestsException")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session():
+    """
+    サービスモデルの探索先を絞った botocore セッションを取得
+    
+    認証情報や読み込み済みのサービスモデルをリージョン間で共有するため、プロセス内で一つだけ作成する。
+    ユーザーディレクトリ（~/.aws/models）のカスタムモデルは使用しないため探索先から外し、
+    コールドスタート時のファイルシステムへのアクセスを減らす
+    
+    Returns:
+        botocore のセッション
+    """
+    # botocore.session の読み込みには数十 ms かかるため、最初の利用時まで遅延する
+    import botocore.session
+    
+    session = botocore.session.Session()
+    loader = session.get_component('data_loader')
+    loader.search_paths[:] = [
+        path for path in loader.search_paths if path != loader.CUSTOMER_DATA_PATH
+    ]
+    return session
+
+
+@functools.lru_cache(maxsize=1)
+def _get_boto_config():
+    """
+    Cognito クライアントの共通設定を取得
+    
+    - retries: 並行呼び出し時のスロットリング（TooManyRequestsException）に備えてクライアント側で再試行する
+    - tcp_keepalive: ウォームスタート間でアイドルになった接続が切断されにくくする
+    - max_pool_connections: create_users / delete_users の並行呼び出しで接続が不足しないようにする
+    - parameter_validation: 必須パラメータは各メソッドで検証済みのため、サービスモデルとの照合を省略する
+    
+    Returns:
+        botocore の Config
+    """
+    # botocore.config の読み込みは botocore の大部分を読み込み百 ms 前後かかる。
+    # utils.auth 経由でトークン検証のみを行う Lambda にも影響するため、最初の利用時まで遅延する
+    from botocore.config import Config
+    
+    return Config(
+        retries={'max_attempts': 10, 'mode': 'adaptive'},
+        tcp_keepalive=True,
+        max_pool_connections=20,
+        parameter_validation=False,
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _get_boto_client(region: str):
+    """
+    リージョンごとの Cognito クライアントを取得
+    
+    クライアントの作成はサービスモデルの読み込み等で時間がかかるため、
+    Lambda のウォームスタート間で再利用する
+    
+    Args:
+        region: AWSリージョン
+        
+    Returns:
+        botocore の cognito-idp クライアント
+    """
+    return _get_session().create_client('cognito-idp', region_name=region, config=_get_boto_config())
 
 
 class CognitoClient:
@@ -58,6 +428,8 @@ class CognitoClient:
     - ユーザー削除 (AdminDeleteUser)
     """
     
+    __slots__ = ('user_pool_id', 'client_id', 'region', 'client')
+    
     def __init__(self, 
                  user_pool_id: Optional[str] = None,
                  client_id: Optional[str] = None,
@@ -70,9 +442,10 @@ class CognitoClient:
             client_id: CognitoクライアントアプリケーションID
             region: AWSリージョン
         """
-        self.user_pool_id = user_pool_id or os.getenv('COGNITO_USER_POOL_ID')
-        self.client_id = client_id or os.getenv('COGNITO_CLIENT_ID')
-        self.region = region or os.getenv('AWS_REGION', 'ap-northeast-1')
+        config = _load_config()
+        self.user_pool_id = user_pool_id or config.user_pool_id
+        self.client_id = client_id or config.client_id
+        self.region = region or config.region
         
         if not self.user_pool_id:
             raise ValidationError("COGNITO_USER_POOL_ID is required")
@@ -80,7 +453,7 @@ class CognitoClient:
             raise ValidationError("COGNITO_CLIENT_ID is required")
         
         try:
-            self.client = boto3.client('cognito-idp', region_name=self.region)
+            self.client = _get_boto_client(self.region)
         except Exception as e:
             raise ServiceError(f"Failed to initialize Cognito client: {str(e)}", original_error=e)
     
@@ -103,6 +476,10 @@ class CognitoClient:
         if not email or not password:
             raise ValidationError("Email and password are required")
         
+        # ログインはユーザーの操作の応答時間に直結するため、既定ではレート制限しない
+        if _load_config().rate_limit_authenticate:
+            _acquire_rate_limit()
+        
         try:
             response = self.client.initiate_auth(
                 ClientId=self.client_id,
@@ -138,11 +515,18 @@ class CognitoClient:
         if not access_token:
             raise ValidationError("Access token is required")
         
+        # サインアウトするトークンのユーザー情報のキャッシュは再利用しない
+        with _USER_CACHE_LOCK:
+            _USER_CACHE.pop(_user_cache_key(access_token), None)
+        
         try:
             response = self.client.global_sign_out(
                 AccessToken=access_token
             )
             
+            # Cognito がトークンを受け付けた場合のみ、このコンテナ内でも無効とする
+            _revoke(access_token)
+            
             return {
                 "success": True,
                 "message": "Successfully logged out"
@@ -153,15 +537,29 @@ class CognitoClient:
         except Exception as e:
             raise ServiceError(f"Unexpected error during logout: {str(e)}", original_error=e)
     
+    def is_revoked(self, access_token: str) -> bool:
+        """
+        トークンがこのコンテナ内でログアウト済みかを確認
+        
+        Args:
+            access_token: JWTアクセストークン
+            
+        Returns:
+            ログアウト済みで、失効情報の保持期限内であれば True
+        """
+        return is_jti_revoked(_unverified_claims(access_token).get('jti'))
+    
     def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """
         ユーザー情報を取得
         
+        同じアクセストークンの結果は _USER_CACHE_TTL 秒間キャッシュする
+        
         Args:
             access_token: JWTアクセストークン
             
         Returns:
-            ユーザー情報
+            ユーザー情報（キャッシュと共有されるため変更しないこと）
             
         Raises:
             AuthorizationError: トークンが無効な場合
@@ -171,20 +569,76 @@ class CognitoClient:
         if not access_token:
             raise ValidationError("Access token is required")
         
+        cache_key = _user_cache_key(access_token)
+        cached = _USER_CACHE.get(cache_key)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+        
         try:
             response = self.client.get_user(
                 AccessToken=access_token
             )
             
-            return self._normalize_user_response(response)
-            
+            user_info = self._normalize_user_response(response)
         except ClientError as e:
             self._handle_client_error(e, "Failed to get user info")
         except Exception as e:
             raise ServiceError(f"Unexpected error getting user info: {str(e)}", original_error=e)
+        
+        with _USER_CACHE_LOCK:
+            _USER_CACHE[cache_key] = (user_info, time.monotonic() + _USER_CACHE_TTL)
+            _USER_CACHE.move_to_end(cache_key)
+            if len(_USER_CACHE) > _USER_CACHE_MAX:
+                _USER_CACHE.popitem(last=False)
+        
+        return user_info
+    
+    def get_user_info_from_token(self, access_token: str) -> Dict[str, Any]:
+        """
+        アクセストークンの署名を検証し、クレームからユーザー情報を取得
+        
+        GetUser を呼び出さずにローカルで検証するため、Cognitoへの通信は
+        JWKSの取得時のみとなる。アクセストークンには email 等の属性が含まれないため、
+        属性が必要な場合は get_user_info を使用すること
+        
+        Args:
+            access_token: JWTアクセストークン
+            
+        Returns:
+            get_user_info と同じ形式のユーザー情報
+            
+        Raises:
+            AuthorizationError: トークンが無効な場合
+            ValidationError: パラメータが不正な場合
+            ServiceError: JWKS取得に失敗した場合
+        """
+        # utils.auth は本モジュールの例外クラスを参照するため遅延インポートする
+        from utils.auth import _get_validator
+        
+        payload = _get_validator(self.user_pool_id, self.region).validate_token(access_token)
+        # ログアウト済みのトークンは署名が有効でも受け付けない
+        if is_jti_revoked(payload.get('jti')):
+            raise AuthorizationError("トークンが無効です")
+        
+        return {
+            "user_id": payload.get('sub'),
+            "username": payload.get('username'),
+            "email": payload.get('email'),
+            "attributes": {
+                # アクセストークンには含まれないため、クレームが無い場合は不明として None を返す
+                "email_verified": (
+                    None if payload.get('email_verified') is None
+                    else payload['email_verified'] in (True, 'true')
+                ),
+                "given_name": payload.get('given_name'),
+                "family_name": payload.get('family_name'),
+                "phone_number": payload.get('phone_number'),
+            }
+        }
     
     def create_user(self, email: str, password: str, 
-                   attributes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                   attributes: Optional[Dict[str, str]] = None,
+                   rate_limit_timeout: Optional[float] = _RATE_LIMIT_TIMEOUT) -> Dict[str, Any]:
         """
         テストユーザーを作成（管理者権限が必要）
         
@@ -192,6 +646,7 @@ class CognitoClient:
             email: ユーザーのメールアドレス
             password: 一時パスワード
             attributes: ユーザー属性（オプション）
+            rate_limit_timeout: レート制限の枠が空くまで待機する最大秒数（None の場合は空くまで待機）
             
         Returns:
             ユーザー作成結果
@@ -203,15 +658,14 @@ class CognitoClient:
         if not email or not password:
             raise ValidationError("Email and password are required")
         
+        # 追加属性があれば末尾に追加
         user_attributes = [
             {'Name': 'email', 'Value': email},
-            {'Name': 'email_verified', 'Value': 'true'}
+            {'Name': 'email_verified', 'Value': 'true'},
+            *({'Name': key, 'Value': value} for key, value in (attributes or {}).items())
         ]
         
-        # 追加属性があれば追加
-        if attributes:
-            for key, value in attributes.items():
-                user_attributes.append({'Name': key, 'Value': value})
+        _acquire_rate_limit(rate_limit_timeout)
         
         try:
             response = self.client.admin_create_user(
@@ -229,12 +683,38 @@ class CognitoClient:
         except Exception as e:
             raise ServiceError(f"Unexpected error creating user: {str(e)}", original_error=e)
     
-    def delete_user(self, email: str) -> Dict[str, Any]:
+    def create_users(self, users: List[Dict[str, Any]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        複数のテストユーザーを並行して作成（管理者権限が必要）
+        
+        AdminCreateUser には一括作成APIが無いため、スレッドプールで並行に呼び出す
+        
+        Args:
+            users: create_user の引数（email, password, attributes）を持つ辞書のリスト
+            max_workers: 同時に実行する最大リクエスト数
+            
+        Returns:
+            ユーザー作成結果のリスト（users と同じ順序）
+            
+        Raises:
+            ValidationError: パラメータが不正な場合
+            ServiceError: サービスエラーの場合
+        """
+        if not users:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(users))) as executor:
+            # 一括処理ではレート制限で失敗させず、枠が空くまで待機する
+            return list(executor.map(lambda user: self.create_user(**user, rate_limit_timeout=None), users))
+    
+    def delete_user(self, email: str,
+                    rate_limit_timeout: Optional[float] = _RATE_LIMIT_TIMEOUT) -> Dict[str, Any]:
         """
         テストユーザーを削除（管理者権限が必要）
         
         Args:
             email: 削除するユーザーのメールアドレス
+            rate_limit_timeout: レート制限の枠が空くまで待機する最大秒数（None の場合は空くまで待機）
             
         Returns:
             ユーザー削除結果
@@ -246,6 +726,8 @@ class CognitoClient:
         if not email:
             raise ValidationError("Email is required")
         
+        _acquire_rate_limit(rate_limit_timeout)
+        
         try:
             response = self.client.admin_delete_user(
                 UserPoolId=self.user_pool_id,
@@ -262,23 +744,47 @@ class CognitoClient:
         except Exception as e:
             raise ServiceError(f"Unexpected error deleting user: {str(e)}", original_error=e)
     
+    def delete_users(self, emails: List[str], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        複数のテストユーザーを並行して削除（管理者権限が必要）
+        
+        AdminDeleteUser には一括削除APIが無いため、スレッドプールで並行に呼び出す
+        
+        Args:
+            emails: 削除するユーザーのメールアドレスのリスト
+            max_workers: 同時に実行する最大リクエスト数
+            
+        Returns:
+            ユーザー削除結果のリスト（emails と同じ順序）
+            
+        Raises:
+            ValidationError: パラメータが不正な場合
+            ServiceError: サービスエラーの場合
+        """
+        if not emails:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(emails))) as executor:
+            # 一括処理ではレート制限で失敗させず、枠が空くまで待機する
+            return list(executor.map(lambda email: self.delete_user(email, rate_limit_timeout=None), emails))
+    
     def _normalize_auth_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """認証レスポンスを正規化"""
-        auth_result = response.get('AuthenticationResult', {})
+        auth_result = response.get('AuthenticationResult') or {}
         
         return {
-            "access_token": auth_result.get('AccessToken'),
-            "refresh_token": auth_result.get('RefreshToken'),
-            "id_token": auth_result.get('IdToken'),
-            "token_type": auth_result.get('TokenType', 'Bearer'),
-            "expires_in": auth_result.get('ExpiresIn', 3600)
+            out_key: auth_result.get(key, default)
+            for out_key, key, default in _AUTH_RESULT_FIELDS
         }
     
     def _normalize_user_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """ユーザー情報レスポンスを正規化"""
+        # 正規化に使用する属性のみを一度の走査で取り出す
         attributes = {}
-        for attr in response.get('UserAttributes', []):
-            attributes[attr['Name']] = attr['Value']
+        for attr in response.get('UserAttributes', ()):
+            name = attr['Name']
+            if name in _USER_ATTRIBUTE_NAMES:
+                attributes[name] = attr['Value']
         
         return {
             "user_id": attributes.get('sub'),
@@ -309,37 +815,20 @@ class CognitoClient:
         error_code = error.response['Error']['Code']
         error_message = error.response['Error']['Message']
         
-        logger.warning(f"{context}: {error_code} - {error_message}")
+        logger.warning("%s: %s - %s", context, error_code, error_message)
         
-        # 認証関連エラー
-        if error_code in ['NotAuthorizedException', 'UserNotFoundException', 
-                         'UserNotConfirmedException', 'PasswordResetRequiredException']:
-            raise AuthenticationError("認証に失敗しました", error_code, error)
-        
-        # 認可関連エラー
-        elif error_code in ['AccessDeniedException', 'UnauthorizedOperation']:
-            raise AuthorizationError("アクセスが拒否されました", error_code, error)
-        
-        # バリデーションエラー
-        elif error_code in ['InvalidParameterException', 'InvalidPasswordException',
-                           'UsernameExistsException', 'AliasExistsException']:
-            raise ValidationError(f"リクエストが不正です: {error_message}", error_code, error)
-        
-        # サービスエラー
-        elif error_code in ['InternalErrorException', 'TooManyRequestsException',
-                           'ResourceNotFoundException']:
-            raise ServiceError(f"サービスエラーが発生しました: {error_message}", error_code, error)
-        
-        # その他のエラー
-        else:
-            raise ServiceError(f"予期しないエラーが発生しました: {error_message}", error_code, error)
+        error_class, template = _ERROR_MAP.get(error_code, _DEFAULT_ERROR)
+        raise error_class(template.format(error_message), error_code, error)
 
 
 # 便利関数
+@functools.lru_cache(maxsize=1)
 def get_cognito_client() -> CognitoClient:
     """
     環境変数から設定を読み込んでCognitoクライアントを作成
     
+    Lambda のウォームスタート間で同じインスタンスを再利用する
+    
     Returns:
         CognitoClient: 設定済みのCognitoクライアント
     """